@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import backend modules (e.g. voice_sessions) the same way main.py does
+sys.path.insert(0, os.path.dirname(__file__))
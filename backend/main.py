@@ -1,6 +1,7 @@
-from fastapi import FastAPI, HTTPException, Depends, status, UploadFile, File, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Depends, Header, status, UploadFile, File, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, EmailStr
 from typing import List, Optional, Dict, Any
 import jwt
@@ -8,14 +9,45 @@ import bcrypt
 from datetime import datetime, timedelta
 import uuid
 import json
+import hashlib
 import os
+import asyncio
+import contextlib
+import logging
 import cloudinary
 import cloudinary.uploader
 import redis
 import openai
 from openai import OpenAI
+from voice_sessions import VoiceSessionRegistry, SessionNotFoundError, SessionLimitError, NotParticipantError
 
-app = FastAPI(title="VoiceFlow CMS API", version="1.0.0")
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def dumps_json(data: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
+
+logger = logging.getLogger("voiceflow")
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    reaper = asyncio.create_task(reap_voice_sessions())
+    try:
+        yield
+    finally:
+        reaper.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await reaper
+
+app = FastAPI(title="VoiceFlow CMS API", version="1.0.0", default_response_class=FastJSONResponse, lifespan=lifespan)
 
 cloudinary.config(
     cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
@@ -56,6 +88,9 @@ content_db = {}
 workspaces_db = {}
 voice_profiles_db = {}
 
+# Serialized bytes and ETag per content document, dropped whenever the document changes
+content_cache: Dict[str, tuple] = {}
+
 class UserCreate(BaseModel):
     email: EmailStr
     password: str
@@ -115,11 +150,54 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+def content_etag(content: dict) -> str:
+    return f'"{content["id"]}-{content["version"]}"'
+
+def serialize_content(content: dict) -> tuple:
+    cached = content_cache.get(content["id"])
+    if cached is None:
+        cached = (content_etag(content), dumps_json(content))
+        content_cache[content["id"]] = cached
+    return cached
+
+def invalidate_content(content_id: str):
+    content_cache.pop(content_id, None)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so a W/ prefix still matches
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in candidates)
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+def cached_json_response(body: bytes, etag: str, if_none_match: Optional[str]) -> Response:
+    if etag_matches(if_none_match, etag):
+        return not_modified_response(etag)
+    return Response(content=body, media_type="application/json", headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+def content_list_response(contents: List[dict], if_none_match: Optional[str]) -> Response:
+    # The list ETag only needs per-document ETags, so a matching poll never touches the cached bodies
+    etag = '"' + hashlib.sha1("\n".join(content_etag(content) for content in contents).encode("utf-8")).hexdigest() + '"'
+    if etag_matches(if_none_match, etag):
+        return not_modified_response(etag)
+    body = b"[" + b",".join(serialize_content(content)[1] for content in contents) + b"]"
+    return cached_json_response(body, etag, None)
+
 class ConnectionManager:
     def __init__(self):
         self.active_connections: Dict[str, List[WebSocket]] = {}
         self.workspace_connections: Dict[str, List[Dict]] = {}
-        self.voice_sessions: Dict[str, Dict] = {}
+        self.voice_sessions = VoiceSessionRegistry(
+            ttl_seconds=float(os.getenv("VOICE_SESSION_TTL_SECONDS", "120")),
+            max_sessions=int(os.getenv("VOICE_SESSION_MAX_ACTIVE", "10000")),
+            max_sessions_per_workspace=int(os.getenv("VOICE_SESSION_MAX_PER_WORKSPACE", "50")),
+            max_participants=int(os.getenv("VOICE_SESSION_MAX_PARTICIPANTS", "25"))
+        )
 
     async def connect(self, websocket: WebSocket, user_id: str, workspace_id: str = None):
         await websocket.accept()
@@ -189,6 +267,26 @@ class ConnectionManager:
 
 manager = ConnectionManager()
 
+VOICE_SESSION_REAP_INTERVAL = float(os.getenv("VOICE_SESSION_REAP_INTERVAL", "15"))
+
+async def announce_expired_sessions(sessions: List[Dict]):
+    for session in sessions:
+        if session.get("workspace_id"):
+            await manager.broadcast_to_workspace(session["workspace_id"], {
+                "type": "voice_session_ended",
+                "session_id": session["id"],
+                "reason": "expired",
+                "timestamp": datetime.utcnow().isoformat()
+            })
+
+async def reap_voice_sessions():
+    while True:
+        await asyncio.sleep(VOICE_SESSION_REAP_INTERVAL)
+        try:
+            await announce_expired_sessions(manager.voice_sessions.reap())
+        except Exception:
+            logger.exception("Voice session reaper failed; retrying next interval")
+
 @app.post("/api/auth/register")
 async def register(user: UserCreate):
     if user.email in users_db:
@@ -262,24 +360,35 @@ async def create_content(content: ContentCreate, current_user: str = Depends(get
         "author_id": current_user,
         "created_at": datetime.utcnow().isoformat(),
         "updated_at": datetime.utcnow().isoformat(),
+        "version": 1,
         "status": "draft"
     }
-    return content_db[content_id]
+    
+    etag, body = serialize_content(content_db[content_id])
+    return cached_json_response(body, etag, None)
 
 @app.get("/api/content")
-async def get_content(workspace_id: Optional[str] = None, current_user: str = Depends(get_current_user)):
+async def get_content(
+    workspace_id: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    current_user: str = Depends(get_current_user)
+):
     user_content = []
     for content_id, content in content_db.items():
         if content["author_id"] == current_user:
             if workspace_id is None or content["workspace_id"] == workspace_id:
                 user_content.append(content)
-    return user_content
+    return content_list_response(user_content, if_none_match)
 
 @app.get("/api/content/search")
-async def search_content(q: str, current_user: str = Depends(get_current_user)):
+async def search_content(
+    q: str,
+    if_none_match: Optional[str] = Header(None),
+    current_user: str = Depends(get_current_user)
+):
     query = q.strip().lower()
     if not query:
-        return []
+        return content_list_response([], if_none_match)
     results = []
     for content in content_db.values():
         if content["author_id"] == current_user:
@@ -287,10 +396,14 @@ async def search_content(q: str, current_user: str = Depends(get_current_user)):
             body = (content.get("content") or "").lower()
             if query in title or query in body:
                 results.append(content)
-    return results
+    return content_list_response(results, if_none_match)
 
 @app.get("/api/content/{content_id}")
-async def get_content_by_id(content_id: str, current_user: str = Depends(get_current_user)):
+async def get_content_by_id(
+    content_id: str,
+    if_none_match: Optional[str] = Header(None),
+    current_user: str = Depends(get_current_user)
+):
     if content_id not in content_db:
         raise HTTPException(status_code=404, detail="Content not found")
     
@@ -298,7 +411,8 @@ async def get_content_by_id(content_id: str, current_user: str = Depends(get_cur
     if content["author_id"] != current_user:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    return content
+    etag, body = serialize_content(content)
+    return cached_json_response(body, etag, if_none_match)
 
 @app.put("/api/content/{content_id}")
 async def update_content(content_id: str, content_update: ContentCreate, current_user: str = Depends(get_current_user)):
@@ -314,10 +428,13 @@ async def update_content(content_id: str, content_update: ContentCreate, current
         "content": content_update.content,
         "content_type": content_update.content_type,
         "spatial_position": content_update.spatial_position or content["spatial_position"],
-        "updated_at": datetime.utcnow().isoformat()
+        "updated_at": datetime.utcnow().isoformat(),
+        "version": content["version"] + 1
     })
+    invalidate_content(content_id)
     
-    return content_db[content_id]
+    etag, body = serialize_content(content_db[content_id])
+    return cached_json_response(body, etag, None)
 
 @app.delete("/api/content/{content_id}")
 async def delete_content(content_id: str, current_user: str = Depends(get_current_user)):
@@ -329,7 +446,8 @@ async def delete_content(content_id: str, current_user: str = Depends(get_curren
         raise HTTPException(status_code=403, detail="Access denied")
     
     del content_db[content_id]
-    return {"message": "Content deleted successfully"}
+    invalidate_content(content_id)
+    return FastJSONResponse({"message": "Content deleted successfully"})
 
 @app.post("/api/workspaces")
 async def create_workspace(workspace: WorkspaceCreate, current_user: str = Depends(get_current_user)):
@@ -585,15 +703,13 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str, workspace_id: s
 
 @app.post("/api/voice/start-session")
 async def start_voice_session(session_data: dict, current_user: str = Depends(get_current_user)):
-    session_id = str(uuid.uuid4())
-    manager.voice_sessions[session_id] = {
-        "id": session_id,
-        "user_id": current_user,
-        "workspace_id": session_data.get("workspace_id"),
-        "started_at": datetime.utcnow().isoformat(),
-        "status": "active",
-        "participants": [current_user]
-    }
+    # Free capacity held by expired sessions before the limit checks, announcing them like the reaper does
+    await announce_expired_sessions(manager.voice_sessions.reap())
+    try:
+        session = manager.voice_sessions.create(current_user, session_data.get("workspace_id"))
+    except SessionLimitError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    session_id = session["id"]
     
     # Notify workspace members about new voice session
     if session_data.get("workspace_id"):
@@ -608,12 +724,12 @@ async def start_voice_session(session_data: dict, current_user: str = Depends(ge
 
 @app.post("/api/voice/join-session/{session_id}")
 async def join_voice_session(session_id: str, current_user: str = Depends(get_current_user)):
-    if session_id not in manager.voice_sessions:
+    try:
+        session = manager.voice_sessions.join(session_id, current_user)
+    except SessionNotFoundError:
         raise HTTPException(status_code=404, detail="Voice session not found")
-    
-    session = manager.voice_sessions[session_id]
-    if current_user not in session["participants"]:
-        session["participants"].append(current_user)
+    except SessionLimitError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     
     # Notify other participants
     if session.get("workspace_id"):
@@ -624,17 +740,73 @@ async def join_voice_session(session_id: str, current_user: str = Depends(get_cu
             "timestamp": datetime.utcnow().isoformat()
         })
     
-    return {"message": "Joined voice session successfully", "participants": session["participants"]}
+    return {"message": "Joined voice session successfully", "participants": sorted(session["participants"])}
+
+@app.post("/api/voice/heartbeat/{session_id}")
+async def voice_session_heartbeat(session_id: str, current_user: str = Depends(get_current_user)):
+    try:
+        manager.voice_sessions.heartbeat(session_id, current_user)
+    except SessionNotFoundError:
+        raise HTTPException(status_code=404, detail="Voice session not found")
+    except NotParticipantError:
+        raise HTTPException(status_code=403, detail="Not a participant of this voice session")
+    
+    return {"session_id": session_id, "expires_in": manager.voice_sessions.ttl_seconds}
+
+@app.post("/api/voice/leave-session/{session_id}")
+async def leave_voice_session(session_id: str, current_user: str = Depends(get_current_user)):
+    try:
+        session = manager.voice_sessions.leave(session_id, current_user)
+    except SessionNotFoundError:
+        raise HTTPException(status_code=404, detail="Voice session not found")
+    except NotParticipantError:
+        raise HTTPException(status_code=403, detail="Not a participant of this voice session")
+    
+    if session.get("workspace_id"):
+        await manager.broadcast_to_workspace(session["workspace_id"], {
+            "type": "user_left_voice_session",
+            "session_id": session_id,
+            "user_id": current_user,
+            "timestamp": datetime.utcnow().isoformat()
+        })
+        if not session["participants"]:
+            await manager.broadcast_to_workspace(session["workspace_id"], {
+                "type": "voice_session_ended",
+                "session_id": session_id,
+                "reason": "empty",
+                "timestamp": datetime.utcnow().isoformat()
+            })
+    
+    return {"message": "Left voice session successfully", "participants": sorted(session["participants"])}
+
+@app.get("/api/voice/sessions")
+async def list_voice_sessions(workspace_id: str, current_user: str = Depends(get_current_user)):
+    if workspace_id not in workspaces_db:
+        raise HTTPException(status_code=404, detail="Workspace not found")
+    
+    if current_user not in workspaces_db[workspace_id]["members"]:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    sessions = [manager.voice_sessions.to_dict(session) for session in manager.voice_sessions.list_workspace(workspace_id)]
+    return {
+        "workspace_id": workspace_id,
+        "sessions": sessions,
+        "total_memory_bytes": sum(session["memory_bytes"] for session in sessions)
+    }
 
 @app.post("/api/voice/end-session/{session_id}")
 async def end_voice_session(session_id: str, current_user: str = Depends(get_current_user)):
-    if session_id not in manager.voice_sessions:
+    try:
+        session = manager.voice_sessions.get(session_id)
+    except SessionNotFoundError:
         raise HTTPException(status_code=404, detail="Voice session not found")
     
-    session = manager.voice_sessions[session_id]
     if session["user_id"] != current_user:
         raise HTTPException(status_code=403, detail="Only session host can end the session")
     
+    # End before awaiting the broadcast so the reaper cannot remove the session in between
+    manager.voice_sessions.end(session_id)
+    
     # Notify all participants
     if session.get("workspace_id"):
         await manager.broadcast_to_workspace(session["workspace_id"], {
@@ -643,7 +815,6 @@ async def end_voice_session(session_id: str, current_user: str = Depends(get_cur
             "timestamp": datetime.utcnow().isoformat()
         })
     
-    del manager.voice_sessions[session_id]
     return {"message": "Voice session ended successfully"}
 
 if __name__ == "__main__":
@@ -19,6 +19,7 @@ class Content(BaseModel):
     author_id: str
     created_at: datetime
     updated_at: datetime
+    version: int = 1
     status: str
 
 class Workspace(BaseModel):
@@ -0,0 +1,133 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.fixture(autouse=True)
+def clean_content():
+    main.content_db.clear()
+    main.content_cache.clear()
+    yield
+    main.content_db.clear()
+    main.content_cache.clear()
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def auth():
+    return {"Authorization": f"Bearer {main.create_access_token({'sub': 'author-1'})}"}
+
+
+def make_content(client, auth, title="Draft", body="Hello"):
+    response = client.post("/api/content", json={"title": title, "content": body, "content_type": "blog_post"}, headers=auth)
+    assert response.status_code == 200
+    return response
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ("", False),
+    ('"abc-1"', True),
+    ('"abc-2"', False),
+    ('"other", "abc-1"', True),
+    ('W/"abc-1"', True),
+    ("*", True),
+])
+def test_etag_matches(header, expected):
+    assert main.etag_matches(header, '"abc-1"') is expected
+
+
+def test_serialize_content_caches_until_invalidated():
+    content = {"id": "abc", "version": 1, "title": "First"}
+    etag, body = main.serialize_content(content)
+    assert etag == '"abc-1"'
+    assert body == main.dumps_json(content)
+
+    content.update({"version": 2, "title": "Second"})
+    assert main.serialize_content(content) == (etag, body)
+
+    main.invalidate_content("abc")
+    etag, body = main.serialize_content(content)
+    assert etag == '"abc-2"'
+    assert b"Second" in body
+
+
+def test_get_by_id_revalidates_after_update(client, auth):
+    content_id = make_content(client, auth).json()["id"]
+    url = f"/api/content/{content_id}"
+
+    first = client.get(url, headers=auth)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    cached = client.get(url, headers={**auth, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+    updated = client.put(url, json={"title": "Edited", "content": "Hello", "content_type": "blog_post"}, headers=auth)
+    assert updated.json()["version"] == 2
+    assert updated.headers["etag"] != etag
+
+    fresh = client.get(url, headers={**auth, "If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.json()["title"] == "Edited"
+    assert fresh.headers["etag"] == updated.headers["etag"]
+
+
+def test_delete_invalidates_cache(client, auth):
+    content_id = make_content(client, auth).json()["id"]
+    client.get(f"/api/content/{content_id}", headers=auth)
+    assert content_id in main.content_cache
+
+    client.delete(f"/api/content/{content_id}", headers=auth)
+    assert content_id not in main.content_cache
+    assert client.get(f"/api/content/{content_id}", headers=auth).status_code == 404
+
+
+def test_list_etag_tracks_add_update_delete(client, auth):
+    first_id = make_content(client, auth, title="One").json()["id"]
+
+    listing = client.get("/api/content", headers=auth)
+    assert listing.status_code == 200
+    assert [item["id"] for item in listing.json()] == [first_id]
+    etag = listing.headers["etag"]
+
+    cached = client.get("/api/content", headers={**auth, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    second_id = make_content(client, auth, title="Two").json()["id"]
+    added = client.get("/api/content", headers={**auth, "If-None-Match": etag})
+    assert added.status_code == 200
+    assert len(added.json()) == 2
+
+    client.put(f"/api/content/{second_id}", json={"title": "Two!", "content": "Hello", "content_type": "blog_post"}, headers=auth)
+    updated = client.get("/api/content", headers={**auth, "If-None-Match": added.headers["etag"]})
+    assert updated.status_code == 200
+    assert updated.json()[1]["title"] == "Two!"
+
+    client.delete(f"/api/content/{second_id}", headers=auth)
+    deleted = client.get("/api/content", headers={**auth, "If-None-Match": updated.headers["etag"]})
+    assert deleted.status_code == 200
+    assert deleted.headers["etag"] == etag
+
+
+def test_search_uses_list_etag(client, auth):
+    make_content(client, auth, title="Needle")
+    make_content(client, auth, title="Hay")
+
+    found = client.get("/api/content/search", params={"q": "needle"}, headers=auth)
+    assert [item["title"] for item in found.json()] == ["Needle"]
+
+    cached = client.get("/api/content/search", params={"q": "needle"}, headers={**auth, "If-None-Match": found.headers["etag"]})
+    assert cached.status_code == 304
+
+    empty = client.get("/api/content/search", params={"q": " "}, headers=auth)
+    assert empty.status_code == 200
+    assert empty.json() == []
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from voice_sessions import VoiceSessionRegistry
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = VoiceSessionRegistry(ttl_seconds=60)
+    monkeypatch.setattr(main.manager, "voice_sessions", registry)
+    return registry
+
+
+@pytest.fixture
+def broadcasts(monkeypatch):
+    sent = []
+
+    async def record(workspace_id, message, exclude_user=None):
+        sent.append((workspace_id, message))
+
+    monkeypatch.setattr(main.manager, "broadcast_to_workspace", record)
+    return sent
+
+
+@pytest.fixture
+def auth():
+    return {"Authorization": f"Bearer {main.create_access_token({'sub': 'host-1'})}"}
+
+
+def test_start_session_announces_sessions_it_reaps(registry, broadcasts, auth):
+    stale = registry.create("someone", "ws-1")
+    registry.heartbeats[stale["id"]] -= registry.ttl_seconds + 1
+
+    response = TestClient(main.app).post("/api/voice/start-session", json={"workspace_id": "ws-2"}, headers=auth)
+
+    assert response.status_code == 200
+    ended = [(workspace_id, message["session_id"], message["reason"])
+             for workspace_id, message in broadcasts if message["type"] == "voice_session_ended"]
+    assert ended == [("ws-1", stale["id"], "expired")]
+
+
+def test_reaper_survives_errors_and_stops_on_shutdown(monkeypatch):
+    calls = []
+
+    def failing_reap():
+        calls.append(1)
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(main, "VOICE_SESSION_REAP_INTERVAL", 0)
+    monkeypatch.setattr(main.manager.voice_sessions, "reap", failing_reap)
+
+    async def run():
+        async with main.lifespan(main.app):
+            while len(calls) < 3:
+                await asyncio.sleep(0)
+
+    asyncio.run(asyncio.wait_for(run(), timeout=5))
+    assert len(calls) >= 3
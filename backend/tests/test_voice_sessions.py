@@ -0,0 +1,160 @@
+import time
+
+import pytest
+
+import voice_sessions
+from voice_sessions import VoiceSessionRegistry, SessionLimitError, SessionNotFoundError, NotParticipantError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(voice_sessions.time, "monotonic", fake)
+    return fake
+
+
+def test_reaps_100k_short_lived_sessions():
+    registry = VoiceSessionRegistry(ttl_seconds=30, max_sessions=200_000, max_sessions_per_workspace=200_000)
+    for i in range(100_000):
+        registry.create(f"user-{i}", f"workspace-{i % 50}")
+    assert len(registry) == 100_000
+    assert len(registry.list_workspace("workspace-7")) == 2_000
+
+    expired = registry.reap(now=time.monotonic() + registry.ttl_seconds + 1)
+
+    assert len(expired) == 100_000
+    assert len(registry) == 0
+    assert registry.workspace_index == {}
+    assert len(registry.heartbeats) == 0
+
+
+def test_reap_keeps_live_sessions(clock):
+    registry = VoiceSessionRegistry(ttl_seconds=10)
+    stale = registry.create("alice", "ws")
+    clock.now += 8
+    live = registry.create("bob", "ws")
+    clock.now += 5
+
+    expired = registry.reap()
+
+    assert [session["id"] for session in expired] == [stale["id"]]
+    assert [session["id"] for session in registry.list_workspace("ws")] == [live["id"]]
+
+
+def test_max_sessions_limit():
+    registry = VoiceSessionRegistry(max_sessions=2)
+    registry.create("alice")
+    registry.create("bob")
+    with pytest.raises(SessionLimitError):
+        registry.create("carol")
+
+
+def test_max_sessions_per_workspace_limit():
+    registry = VoiceSessionRegistry(max_sessions_per_workspace=1)
+    registry.create("alice", "ws-1")
+    with pytest.raises(SessionLimitError):
+        registry.create("bob", "ws-1")
+    registry.create("bob", "ws-2")
+
+
+def test_max_participants_limit():
+    registry = VoiceSessionRegistry(max_participants=2)
+    session = registry.create("alice")
+    registry.join(session["id"], "bob")
+    registry.join(session["id"], "bob")
+    with pytest.raises(SessionLimitError):
+        registry.join(session["id"], "carol")
+    assert session["participants"] == {"alice", "bob"}
+
+
+def test_reap_frees_capacity_held_by_expired_sessions(clock):
+    registry = VoiceSessionRegistry(ttl_seconds=10, max_sessions=1, max_sessions_per_workspace=1)
+    stale = registry.create("alice", "ws")
+    clock.now += 11
+    with pytest.raises(SessionLimitError):
+        registry.create("bob", "ws")
+
+    assert [session["id"] for session in registry.reap()] == [stale["id"]]
+    session = registry.create("bob", "ws")
+    assert registry.list_workspace("ws") == [session]
+
+
+def test_expired_session_is_gone_before_reaping(clock):
+    registry = VoiceSessionRegistry(ttl_seconds=10)
+    session = registry.create("alice", "ws")
+    clock.now += 10
+
+    assert session["id"] not in registry
+    assert registry.list_workspace("ws") == []
+    with pytest.raises(SessionNotFoundError):
+        registry.get(session["id"])
+    with pytest.raises(SessionNotFoundError):
+        registry.join(session["id"], "bob")
+    with pytest.raises(SessionNotFoundError):
+        registry.heartbeat(session["id"], "alice")
+    assert [expired["id"] for expired in registry.reap()] == [session["id"]]
+
+
+@pytest.mark.parametrize("touch", [
+    lambda registry, session_id: registry.join(session_id, "bob"),
+    lambda registry, session_id: registry.heartbeat(session_id, "alice"),
+])
+def test_join_and_heartbeat_push_expiry_forward(clock, touch):
+    registry = VoiceSessionRegistry(ttl_seconds=10)
+    session = registry.create("alice", "ws")
+    clock.now += 8
+    touch(registry, session["id"])
+    clock.now += 5
+
+    assert registry.reap() == []
+    assert session["id"] in registry
+
+    clock.now += 6
+    assert [expired["id"] for expired in registry.reap()] == [session["id"]]
+
+
+def test_heartbeat_rejects_non_participant():
+    registry = VoiceSessionRegistry()
+    session = registry.create("alice")
+    with pytest.raises(NotParticipantError):
+        registry.heartbeat(session["id"], "mallory")
+    with pytest.raises(SessionNotFoundError):
+        registry.heartbeat("missing")
+
+
+def test_leave_rejects_non_participant():
+    registry = VoiceSessionRegistry()
+    session = registry.create("alice")
+    with pytest.raises(NotParticipantError):
+        registry.leave(session["id"], "mallory")
+
+
+def test_last_participant_leaving_ends_session():
+    registry = VoiceSessionRegistry()
+    session = registry.create("alice", "ws")
+    registry.join(session["id"], "bob")
+
+    registry.leave(session["id"], "alice")
+    assert session["id"] in registry
+
+    registry.leave(session["id"], "bob")
+    assert session["id"] not in registry
+    assert registry.workspace_index == {}
+    assert len(registry.heartbeats) == 0
+
+
+def test_to_dict_reports_participants_and_memory():
+    registry = VoiceSessionRegistry()
+    session = registry.create("bob")
+    registry.join(session["id"], "alice")
+    data = registry.to_dict(session)
+    assert data["participants"] == ["alice", "bob"]
+    assert data["memory_bytes"] > 0
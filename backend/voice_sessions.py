@@ -0,0 +1,146 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+import sys
+import time
+import uuid
+
+
+class SessionNotFoundError(Exception):
+    pass
+
+
+class SessionLimitError(Exception):
+    pass
+
+
+class NotParticipantError(Exception):
+    pass
+
+
+class VoiceSessionRegistry:
+    def __init__(
+        self,
+        ttl_seconds: float = 120,
+        max_sessions: int = 10000,
+        max_sessions_per_workspace: int = 50,
+        max_participants: int = 25,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_sessions_per_workspace = max_sessions_per_workspace
+        self.max_participants = max_participants
+        self.sessions: Dict[str, Dict] = {}
+        self.workspace_index: Dict[str, Set[str]] = {}
+        # Session ids ordered by last heartbeat, oldest first, so reaping stops at the first live session
+        self.heartbeats: "OrderedDict[str, float]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.is_live(session_id)
+
+    def is_live(self, session_id: str, now: Optional[float] = None) -> bool:
+        # Sessions past their TTL count as gone even before the reaper removes them
+        last_seen = self.heartbeats.get(session_id)
+        return last_seen is not None and last_seen + self.ttl_seconds > (time.monotonic() if now is None else now)
+
+    def get(self, session_id: str) -> Dict:
+        if not self.is_live(session_id):
+            raise SessionNotFoundError(session_id)
+        return self.sessions[session_id]
+
+    def create(self, user_id: str, workspace_id: Optional[str] = None) -> Dict:
+        if len(self.sessions) >= self.max_sessions:
+            raise SessionLimitError("Too many active voice sessions")
+        if workspace_id and len(self.workspace_index.get(workspace_id, ())) >= self.max_sessions_per_workspace:
+            raise SessionLimitError("Too many active voice sessions in this workspace")
+
+        session_id = str(uuid.uuid4())
+        session = {
+            "id": session_id,
+            "user_id": user_id,
+            "workspace_id": workspace_id,
+            "started_at": datetime.utcnow().isoformat(),
+            "status": "active",
+            "participants": {user_id},
+        }
+        self.sessions[session_id] = session
+        if workspace_id:
+            self.workspace_index.setdefault(workspace_id, set()).add(session_id)
+        self.heartbeats[session_id] = time.monotonic()
+        return session
+
+    def join(self, session_id: str, user_id: str) -> Dict:
+        session = self.get(session_id)
+        if user_id not in session["participants"]:
+            if len(session["participants"]) >= self.max_participants:
+                raise SessionLimitError("Voice session is full")
+            session["participants"].add(user_id)
+        self.heartbeat(session_id)
+        return session
+
+    def leave(self, session_id: str, user_id: str) -> Dict:
+        session = self.get(session_id)
+        if user_id not in session["participants"]:
+            raise NotParticipantError(user_id)
+        session["participants"].remove(user_id)
+        if not session["participants"]:
+            self.end(session_id)
+        return session
+
+    def heartbeat(self, session_id: str, user_id: Optional[str] = None):
+        session = self.get(session_id)
+        if user_id is not None and user_id not in session["participants"]:
+            raise NotParticipantError(user_id)
+        self.heartbeats[session_id] = time.monotonic()
+        self.heartbeats.move_to_end(session_id)
+
+    def end(self, session_id: str) -> Dict:
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            raise SessionNotFoundError(session_id)
+        self.heartbeats.pop(session_id, None)
+        workspace_id = session["workspace_id"]
+        if workspace_id and workspace_id in self.workspace_index:
+            self.workspace_index[workspace_id].discard(session_id)
+            if not self.workspace_index[workspace_id]:
+                del self.workspace_index[workspace_id]
+        return session
+
+    def reap(self, now: Optional[float] = None) -> List[Dict]:
+        deadline = (time.monotonic() if now is None else now) - self.ttl_seconds
+        expired = []
+        while self.heartbeats:
+            session_id, last_seen = next(iter(self.heartbeats.items()))
+            if last_seen > deadline:
+                break
+            expired.append(self.end(session_id))
+        return expired
+
+    def list_workspace(self, workspace_id: str) -> List[Dict]:
+        now = time.monotonic()
+        return [
+            self.sessions[session_id]
+            for session_id in self.workspace_index.get(workspace_id, ())
+            if self.is_live(session_id, now)
+        ]
+
+    def session_memory(self, session: Dict) -> int:
+        size = sys.getsizeof(session)
+        for key, value in session.items():
+            size += sys.getsizeof(key) + sys.getsizeof(value)
+            if isinstance(value, set):
+                size += sum(sys.getsizeof(item) for item in value)
+        return size
+
+    def to_dict(self, session: Dict) -> Dict:
+        last_seen = self.heartbeats.get(session["id"])
+        expires_in = max(0.0, last_seen + self.ttl_seconds - time.monotonic()) if last_seen is not None else 0.0
+        return {
+            **session,
+            "participants": sorted(session["participants"]),
+            "expires_in": round(expires_in, 1),
+            "memory_bytes": self.session_memory(session),
+        }